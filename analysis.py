@@ -1,279 +1,405 @@
 import os
+import sys
+import stat
 from typing import Dict, Any, List, Tuple
-from collections import defaultdict
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import utils
-import navigation
 
 
-def count_files(path: str) -> Tuple[bool, int]:
-    """
-    Recursive counting of files in a Windows directory
-    
-    Uses navigation.list_directory() to get the contents of the directory
-    Recursively traverses subdirectories, counting the total number of files
-    """
-    if not os.path.exists(path):
-        return False, 0
+# Defining categories of Windows extensions for classification
+WINDOWS_EXTENSION_CATEGORIES = {
+    'executables': {'.exe', '.dll', '.msi', '.sys', '.com'},
+    'scripts': {'.bat', '.cmd', '.ps1', '.vbs', '.js'},
+    'office_docs': {'.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx'},
+    'archives': {'.zip', '.rar', '.7z', '.cab', '.iso'},
+    'system_files': {'.ini', '.inf', '.reg', '.dmp', '.log'},
+    'shortcuts': {'.lnk', '.url'},
+    'drivers': {'.drv', '.sys', '.vxd'},
+    'media': {'.wmv', '.wma', '.asf'}  # Windows Media Formats
+}
+
+# Flat extension -> category table for an O(1) lookup per file
+# (the first category wins, as '.sys' is listed twice)
+EXTENSION_TO_CATEGORY = {}
+for _category_name, _category_exts in WINDOWS_EXTENSION_CATEGORIES.items():
+    for _ext in _category_exts:
+        EXTENSION_TO_CATEGORY.setdefault(_ext, _category_name)
+
+
+# Windows swap/hibernation files, not counted in the total size
+SKIPPED_SYSTEM_FILES = frozenset({'pagefile.sys', 'hiberfil.sys',
+                                  'swapfile.sys'})
+
+# Parallel walk settings: the root must have more subdirectories than
+# PARALLEL_MIN_SUBDIRS for the thread pool to pay off
+PARALLEL_MIN_SUBDIRS = 4
+PARALLEL_MAX_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Tie-breaker for the largest-files heap, so file dicts are never compared
+_heap_order = itertools.count()
+
+
+def create_default_stats():
+    """Creates a dictionary with standard statistics values"""
+    return {
+        'count': 0,          # Number of files with this extension
+        'total_size': 0,     # Total size in bytes
+        'size': 0,           # alias for compatibility (main.py )
+        'category': 'other', # Extension category
+        'is_windows': False  # Is the extension Windows-specific
+    }
 
-    total_files = 0
-    # Getting the contents of the current directory
-    success, items = navigation.list_directory(path)
 
-    if not success:
-        return False, 0
+def _scan_directory(path: str) -> Tuple[bool, List[str],
+                                       List[Tuple[os.DirEntry, os.stat_result]]]:
+    """
+    Lists one directory with os.scandir()
 
-    for item in items:
-        # Creating the full path to the element
-        item_path = os.path.join(path, item['name'])
+    On Windows DirEntry keeps the data returned by FindNextFileW, so
+    is_symlink(), is_dir() and stat() do not need extra syscalls
+    Returns (success, subdirectory paths, [(file entry, its stat)])
+    """
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                # Skip symlinks to avoid loops
+                if entry.is_symlink():
+                    continue
 
-        if item['type'] == 'directory':
-            # Recursive call for subdirectories
-            sub_success, sub_count = count_files(item_path)
-            if sub_success:
-                total_files += sub_count
-        else:
-            # Counting the file
-            total_files += 1
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
 
-    return True, total_files
+                try:
+                    files.append((entry, entry.stat(follow_symlinks=False)))
+                except OSError:
+                    # The file may have been deleted after the listing
+                    continue
+    except OSError:
+        return False, [], []
 
+    return True, subdirs, files
 
-def count_bytes(path: str) -> Tuple[bool, int]:
+
+def _collect_directory(files: List[Tuple[os.DirEntry, os.stat_result]],
+                       counters: Dict[str, int],
+                       ext_stats: Dict[str, List[Any]],
+                       attr_stats: Dict[str, int],
+                       largest: List[Tuple[int, int, Dict[str, Any]]],
+                       max_files: int) -> None:
     """
-    Рекурсивный подсчет размера файлов в Windows
-    
-    Использует count_files() как основу для обхода файловой системы
-    Суммирует размеры всех файлов в байтах
+    Updates the accumulators with the files of one directory
+
+    This is the innermost loop of every analysis, so each value is only
+    computed by the block that needs it
     """
-    if not os.path.exists(path):
-        return False, 0
+    for entry, entry_stat in files:
+        filename = entry.name.lower()
+        file_size = entry_stat.st_size
+
+        #1. Number of files and total size
+        if counters is not None:
+            counters['files'] += 1
+            # Skip Windows system files
+            if filename not in SKIPPED_SYSTEM_FILES:
+                counters['bytes'] += file_size
+
+        #2. Statistics on file extensions
+        if ext_stats is not None:
+            # We take the last part after the dot and add the dot itself
+            _, dot, tail = filename.rpartition('.')
+            ext = dot + tail if dot else 'без расширения'
+
+            # A flat [count, total_size, category, is_windows] record
+            record = ext_stats.get(ext)
+            if record is None:
+                # The category never changes, so it is looked up only once
+                record = [0, 0, EXTENSION_TO_CATEGORY.get(ext, 'other'),
+                          ext in EXTENSION_TO_CATEGORY]
+                ext_stats[ext] = record
+            record[0] += 1
+            record[1] += file_size
+
+        #3. Statistics on file attributes (bits of the cached attributes)
+        if attr_stats is not None:
+            # st_file_attributes is only available on Windows
+            add_file_attributes(attr_stats,
+                                getattr(entry_stat, 'st_file_attributes', 0))
+
+        #4. Search for the largest files
+        if largest is not None:
+            # Most files are smaller than the smallest kept one: they are
+            # rejected before any tuple or dict is built for them
+            if (len(largest) >= max_files
+                    and (not largest or file_size < largest[0][0])):
+                continue
 
-    total_size = 0
+            # A min-heap of (size, order, info): the smallest of the kept
+            # files is on top, the order number breaks ties between sizes
+            heap_item = (file_size, next(_heap_order), {
+                'path': entry.path,
+                'name': entry.name,
+                'size': file_size
+            })
 
-    def recursive_calc(current_path: str) -> None:
-        # nonlocal allows you to change a variable from an external function
-        nonlocal total_size
+            if len(largest) < max_files:
+                heapq.heappush(largest, heap_item)
+            else:
+                # Push the new file and drop the smallest one in one step
+                heapq.heappushpop(largest, heap_item)
+
+
+def _walk_tree(stack: List[str],
+               counters: Dict[str, int],
+               ext_stats: Dict[str, List[Any]],
+               attr_stats: Dict[str, int],
+               largest: List[Tuple[int, int, Dict[str, Any]]],
+               max_files: int) -> None:
+    """
+    Walks all the directories from the stack and their subdirectories
 
-        # Getting the contents of the current directory
-        success, items = navigation.list_directory(current_path)
+    An explicit stack instead of recursion: no call frame per directory
+    and no RecursionError on very deep trees
+    """
+    while stack:
+        current_path = stack.pop()
+        success, subdirs, files = _scan_directory(current_path)
         if not success:
-            return
+            continue
+        stack.extend(subdirs)
 
-        for item in items:
-            item_path = os.path.join(current_path, item['name'])
+        _collect_directory(files, counters, ext_stats, attr_stats,
+                           largest, max_files)
 
-            # Skip symlinks to avoid loops
-            if os.path.islink(item_path):
-                continue
 
-            if item['type'] == 'directory':
-                # Recursive traversal of subdirectories
-                recursive_calc(item_path)
+def _walk_partial(path: str,
+                  want_counters: bool,
+                  want_ext_stats: bool,
+                  want_attr_stats: bool,
+                  want_largest: bool,
+                  max_files: int) -> Tuple[Any, Any, Any, Any]:
+    """
+    Walks one subtree into its own, private accumulators
+
+    Used by the parallel walk: a worker shares nothing with the others,
+    so it needs no lock. Returns (counters, ext_stats, attr_stats, largest)
+    with None for the accumulators that were not requested
+    """
+    counters = {'files': 0, 'bytes': 0} if want_counters else None
+    ext_stats = {} if want_ext_stats else None
+    attr_stats = create_attribute_stats() if want_attr_stats else None
+    largest = [] if want_largest else None
+
+    _walk_tree([path], counters, ext_stats, attr_stats, largest, max_files)
+
+    return counters, ext_stats, attr_stats, largest
+
+
+def _merge_partial(partial: Tuple[Any, Any, Any, Any],
+                   counters: Dict[str, int],
+                   ext_stats: Dict[str, List[Any]],
+                   attr_stats: Dict[str, int],
+                   largest: List[Tuple[int, int, Dict[str, Any]]],
+                   max_files: int) -> None:
+    """Adds the accumulators of one _walk_partial() to the shared ones"""
+    part_counters, part_ext_stats, part_attr_stats, part_largest = partial
+
+    if counters is not None:
+        for key, value in part_counters.items():
+            counters[key] += value
+
+    if ext_stats is not None:
+        for ext, part_record in part_ext_stats.items():
+            record = ext_stats.get(ext)
+            if record is None:
+                ext_stats[ext] = part_record
             else:
-                # Skip Windows system files
-                if item['name'].lower() in ['pagefile.sys', 'hiberfil.sys',
-                                            'swapfile.sys']:
-                    continue
-                try:
-                    # We get the file size and add it to the total amount
-                    total_size += os.path.getsize(item_path)
-                except (OSError, PermissionError):
-                    # Some files may be unreadable in size
-                    continue
+                record[0] += part_record[0]
+                record[1] += part_record[1]
+
+    if attr_stats is not None:
+        for key, value in part_attr_stats.items():
+            attr_stats[key] += value
 
-    # Starting the recursive calculation
-    recursive_calc(path)
-    return True, total_size
+    if largest is not None:
+        for heap_item in part_largest:
+            if len(largest) < max_files:
+                heapq.heappush(largest, heap_item)
+            else:
+                heapq.heappushpop(largest, heap_item)
 
 
-def analyze_windows_file_types(path: str) -> Tuple[bool, Dict[str, Dict[str, Any]]]:
+def _walk_once(path: str,
+               counters: Dict[str, int] = None,
+               ext_stats: Dict[str, List[Any]] = None,
+               attr_stats: Dict[str, int] = None,
+               largest: List[Tuple[int, int, Dict[str, Any]]] = None,
+               max_files: int = 3) -> bool:
     """
-    File type analysis based on Windows extensions
-    
-        Collects statistics on extensions specific to Windows:
-        .exe, .dll, .msi, .bat, .ps1, .docx, .xlsx, etc.
-        Groups files by extensions, calculates the number and total size
+    A single walk feeding all the analyses at once
+
+    Lists every directory exactly once with os.scandir() and reuses
+    the cached DirEntry data for each file, then updates every
+    accumulator that was passed in (None means "not needed"):
+    - counters: {'files': X, 'bytes': Y}
+    - ext_stats: {extension: [count, total_size, category, is_windows]}
+    - attr_stats: {'hidden': X, 'system': Y, 'readonly': Z, 'archive': W}
+    - largest: heapq min-heap of (size, order, file info) holding
+      the max_files largest files
+    If the root has enough subdirectories, they are walked in parallel
+    Returns False if the root directory could not be listed
     """
-    if not os.path.exists(path):
-        return False, {}
+    success, subdirs, files = _scan_directory(path)
+    if not success:
+        return False
 
-    # Defining categories of Windows extensions for classification
-    windows_extension_categories = {
-        'executables': {'.exe', '.dll', '.msi', '.sys', '.com'},
-        'scripts': {'.bat', '.cmd', '.ps1', '.vbs', '.js'},
-        'office_docs': {'.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx'},
-        'archives': {'.zip', '.rar', '.7z', '.cab', '.iso'},
-        'system_files': {'.ini', '.inf', '.reg', '.dmp', '.log'},
-        'shortcuts': {'.lnk', '.url'},
-        'drivers': {'.drv', '.sys', '.vxd'},
-        'media': {'.wmv', '.wma', '.asf'}  # Windows Media Formats
-    }
+    _collect_directory(files, counters, ext_stats, attr_stats,
+                       largest, max_files)
+
+    if len(subdirs) <= PARALLEL_MIN_SUBDIRS:
+        _walk_tree(subdirs, counters, ext_stats, attr_stats,
+                   largest, max_files)
+        return True
+
+    # The walk waits on the file system most of the time and the GIL is
+    # released during these calls, so the subtrees are listed by threads.
+    # Each subtree is collected separately and merged once at the end
+    with ThreadPoolExecutor(max_workers=PARALLEL_MAX_WORKERS) as executor:
+        futures = [executor.submit(_walk_partial, subdir,
+                                   counters is not None,
+                                   ext_stats is not None,
+                                   attr_stats is not None,
+                                   largest is not None, max_files)
+                   for subdir in subdirs]
+        for future in futures:
+            # Re-raises an exception from the worker, if there was one
+            _merge_partial(future.result(), counters, ext_stats,
+                           attr_stats, largest, max_files)
 
-    # We collect all Windows-specific extensions in one set
-    all_windows_extensions = set()
-    for category in windows_extension_categories.values():
-        all_windows_extensions.update(category)
+    return True
 
 
-    def create_default_stats():
-        """Creates a dictionary with standard statistics values"""
-        return {
-            'count': 0,          # Number of files with this extension
-            'total_size': 0,     # Total size in bytes
-            'size': 0,           # alias for compatibility (main.py )
-            'category': 'other', # Extension category
-            'is_windows': False  # Is the extension Windows-specific
-        }
+def count_files(path: str) -> Tuple[bool, int]:
+    """
+    Recursive counting of files in a Windows directory
+    
+    Builds only the file counter on top of _walk_once()
+    """
+    # A missing path is reported by _walk_once() itself
+    counters = {'files': 0, 'bytes': 0}
+    success = _walk_once(path, counters=counters)
 
-    # Using defaultdict to automatically create records
-    extensions_stats = defaultdict(create_default_stats)
+    return success, counters['files']
 
-    
-    def collect_extensions(current_path: str) -> None:
-        """Recursive collection of statistics on file extensions"""
-        success, items = navigation.list_directory(current_path)
-        if not success:
-            return
 
-        for item in items:
-            item_path = os.path.join(current_path, item['name'])
+def count_bytes(path: str) -> Tuple[bool, int]:
+    """
+    Рекурсивный подсчет размера файлов в Windows
+    
+    Использует _walk_once() для обхода файловой системы
+    Суммирует размеры всех файлов в байтах
+    """
+    counters = {'files': 0, 'bytes': 0}
+    success = _walk_once(path, counters=counters)
 
-            if item['type'] == 'directory':
-                # Recursively traversing subdirectories
-                collect_extensions(item_path)
-            else:
-                # Extract the file extension
-                filename = item['name']
-                if '.' in filename:
-                    # We take the last part after the dot and add the dot itself
-                    ext = '.' + filename.lower().split('.')[-1]
-                else:
-                    ext = 'без расширения'
-
-                # Defining the file category
-                category = 'other'
-                is_windows = ext in all_windows_extensions
-
-                # Looking for a category in the dictionary of Windows extensions
-                for cat_name, cat_exts in windows_extension_categories.items():
-                    if ext in cat_exts:
-                        category = cat_name
-                        break
-
-                # Getting the file size
-                try:
-                    file_size = os.path.getsize(item_path)
-                except (OSError, PermissionError):
-                    file_size = 0
-
-                # Updating statistics for this extension
-                stats = extensions_stats[ext]
-                stats['count'] += 1
-                stats['total_size'] += file_size
-                stats['size'] = stats['total_size']
-                stats['category'] = category
-                stats['is_windows'] = is_windows
+    return success, counters['bytes']
 
-    # Starting statistics collection
-    collect_extensions(path)
 
-    # Convert defaultdict to a regular dictionary
-    result = dict(extensions_stats)
-    
-    # Add formatted size for each extension
-    for ext in result:
-        stats = result[ext]
-        stats['formatted_size'] = utils.format_size(stats['total_size'])
-        # Synchronize the alias (in case the dict came from outside)
-        stats['size'] = stats['total_size']
+def _finalize_type_stats(extensions_stats: Dict[str, List[Any]]
+                         ) -> Dict[str, Dict[str, Any]]:
+    """
+    Sorts the collected extension records and turns them into
+    the statistics dictionaries (see create_default_stats)
+    """
+    # Sort extensions by the number of files (in descending order), in place
+    items = list(extensions_stats.items())
+    items.sort(key=lambda item: item[1][0], reverse=True)
 
-    # Sort extensions by the number of files (in descending order)
-    sorted_items = sorted(result.items(), key=get_item_count, reverse=True)
-    sorted_result = dict(sorted_items)
+    result = {}
+    for ext, (count, total_size, category, is_windows) in items:
+        stats = create_default_stats()
+        stats['count'] = count
+        stats['total_size'] = total_size
+        stats['size'] = total_size
+        stats['category'] = category
+        stats['is_windows'] = is_windows
+        # Add formatted size for each extension
+        stats['formatted_size'] = utils.format_size(total_size)
+        result[ext] = stats
 
-    return True, sorted_result
+    return result
 
 
-def get_windows_file_attributes_stats(path: str) -> Dict[str, int]:
+def analyze_windows_file_types(path: str) -> Tuple[bool, Dict[str, Dict[str, Any]]]:
     """
-    Statistics on Windows file attributes
+    File type analysis based on Windows extensions
     
-    Analyzes file attributes: hidden, system, read-only
-    Uses utils.is_hidden_windows_file() and other checks
-    Returns statistics: {'hidden': X, 'system': Y, 'readonly':Z, 'archive': W}
+        Collects statistics on extensions specific to Windows:
+        .exe, .dll, .msi, .bat, .ps1, .docx, .xlsx, etc.
+        Groups files by extensions, calculates the number and total size
     """
-    stats = {
+    # Records are created by the walk on the first file of each extension
+    extensions_stats = {}
+
+    # Starting statistics collection
+    if not _walk_once(path, ext_stats=extensions_stats):
+        return False, {}
+
+    return True, _finalize_type_stats(extensions_stats)
+
+
+def create_attribute_stats() -> Dict[str, int]:
+    """Creates a dictionary of attribute counters"""
+    return {
         'hidden': 0,    # Hidden files
         'system': 0,    # System files
         'readonly': 0,  # Read-only files
         'archive': 0    # Archived files
     }
 
-    def collect_attributes(current_path: str) -> None:
-        """Recursive collection of statistics on file attributes"""
-        success, items = navigation.list_directory(current_path)
-        if not success:
-            return
-
-        for item in items:
-            item_path = os.path.join(current_path, item['name'])
-
-            # We check only files (not folders)
-            if item['type'] == 'file':
-                try:
-                    #1. Checking hidden files
-                    if utils.is_hidden_windows_file(item_path):
-                        stats['hidden'] += 1
-
-                    #2. Checking system files by extension and location
-                    filename = item['name'].lower()
-                    dirname = os.path.dirname(item_path).lower()
-
-                    # System files are usually located in system folders
-                    if (filename.endswith(('.sys', '.dll', '.drv')) and
-                       ('windows' in dirname or 'system32' in dirname or
-                        'winnt' in dirname)):
-                        stats['system'] += 1
-
-                    #3. Checking read-only files
-                    if not os.access(item_path, os.W_OK):
-                        stats['readonly'] += 1
-
-                    #4. Checking archived files by extension
-                    if filename.endswith(('.zip', '.rar', '.7z', '.tar',
-                                          '.gz', '.cab')):
-                        stats['archive'] += 1
-
-                except (OSError, PermissionError):
-                    #4. Checking archived files by extension
-                    continue
-            else:
-                # If it's a folder, recursively bypass it
-                collect_attributes(item_path)
 
-    # Start collecting statistics if the path exists
-    if os.path.exists(path):
-        collect_attributes(path)
+def add_file_attributes(attr_stats: Dict[str, int], file_attrs: int) -> None:
+    """
+    Adds one file to the attribute counters of create_attribute_stats()
 
-    return stats
+    file_attrs is the st_file_attributes bitmask (FILE_ATTRIBUTE_*)
+    """
+    if file_attrs & stat.FILE_ATTRIBUTE_HIDDEN:
+        attr_stats['hidden'] += 1
+    if file_attrs & stat.FILE_ATTRIBUTE_SYSTEM:
+        attr_stats['system'] += 1
+    if file_attrs & stat.FILE_ATTRIBUTE_READONLY:
+        attr_stats['readonly'] += 1
+    if file_attrs & stat.FILE_ATTRIBUTE_ARCHIVE:
+        attr_stats['archive'] += 1
 
 
-def get_item_count(item_tuple):
+def get_windows_file_attributes_stats(path: str) -> Dict[str, int]:
     """
-    Auxiliary function for getting the number of files from an element
+    Statistics on Windows file attributes
     
-    Accepts a tuple (extension, statistics) and returns the number of files
-    Used as the sorting key in analyze_windows_file_types()
+    Analyzes file attributes: hidden, system, read-only, archive
+    Tests the FILE_ATTRIBUTE_* bits of the cached st_file_attributes,
+    so no extra system call is made per file
+    Returns statistics: {'hidden': X, 'system': Y, 'readonly':Z, 'archive': W}
     """
-    # item_tuple[1] is a dictionary of statistics, ['count'] is the number of files
-    return item_tuple[1]['count']
+    stats = create_attribute_stats()
+
+    # A missing path simply leaves all the counters at zero
+    _walk_once(path, attr_stats=stats)
+
+    return stats
 
 
 def show_windows_directory_stats(path: str) -> bool:
     """
     Comprehensive output of Windows catalog statistics
     
-    Uses ALL of the above analysis functions
+    Collects ALL of the above analyses in a single walk (_walk_once)
     Displays summary information about the catalog:
     - Total number of files and folders
     - Distribution by file type
@@ -285,100 +411,65 @@ def show_windows_directory_stats(path: str) -> bool:
         print(f"Путь не существует: {path}")
         return False
 
+    # One traversal fills every accumulator
+    counters = {'files': 0, 'bytes': 0}
+    extensions_stats = {}
+    attr_stats = create_attribute_stats()
+    largest_files = []
+
+    success = _walk_once(path, counters, extensions_stats, attr_stats,
+                         largest_files, 3)
+
+    # The report is collected into a buffer and written in one call
+    lines = []
+
     # Header output
-    print(f"\nСТАТИСТИКА КАТАЛОГА: {path}")
-    print("=" * 60)
+    lines.append(f"\nСТАТИСТИКА КАТАЛОГА: {path}")
+    lines.append("=" * 60)
 
     #1. General information (files and size)
-    print("\n1. ОБЩАЯ ИНФОРМАЦИЯ:")
-    print("-" * 40)
-
-    success_files, file_count = count_files(path)
-    if success_files:
-        print(f"Файлов: {file_count}")
+    lines.append("\n1. ОБЩАЯ ИНФОРМАЦИЯ:")
+    lines.append("-" * 40)
 
-    success_size, total_bytes = count_bytes(path)
-    if success_size:
-        print(f"Общий размер: {utils.format_size(total_bytes)}")
+    if success:
+        lines.append(f"Файлов: {counters['files']}")
+        lines.append(f"Общий размер: {utils.format_size(counters['bytes'])}")
 
     #2. Distribution by file type
-    print("\n2. ТИПЫ ФАЙЛОВ (ТОП-5):")
-    print("-" * 40)
-
-    success_types, types_stats = analyze_windows_file_types(path)
-    if success_types and types_stats:
-        # Sorting and taking the top 5 most common extensions
-        sorted_items = sorted(types_stats.items(),
-                              key=get_item_count,
-                              reverse=True)[:5]
-        for ext, stats in sorted_items:
-            print(f"  {ext}: {stats['count']} файлов, {stats['formatted_size']}")
+    lines.append("\n2. ТИПЫ ФАЙЛОВ (ТОП-5):")
+    lines.append("-" * 40)
+
+    types_stats = _finalize_type_stats(extensions_stats)
+    if types_stats:
+        # The result is already sorted by count: take the top 5 as is
+        for ext, stats in itertools.islice(types_stats.items(), 5):
+            lines.append(f"  {ext}: {stats['count']} файлов, {stats['formatted_size']}")
 
     # 3. Statistics on file attributes
-    print("\n3. АТРИБУТЫ ФАЙЛОВ:")
-    print("-" * 40)
+    lines.append("\n3. АТРИБУТЫ ФАЙЛОВ:")
+    lines.append("-" * 40)
 
-    attr_stats = get_windows_file_attributes_stats(path)
     for attr_name, attr_value in attr_stats.items():
-        print(f"  {attr_name}: {attr_value}")
+        lines.append(f"  {attr_name}: {attr_value}")
 
     #4. Search for the largest files
-    print("\n4. КРУПНЕЙШИЕ ФАЙЛЫ (ТОП-3):")
-    print("-" * 40)
-
-    largest_files = []
-
-    def get_file_size(item):
-        """Auxiliary function for getting the file size from the dictionary"""
-        return item['size']
-
-    def find_large_files(current_path: str,
-                         file_list: list,
-                         max_files: int = 3) -> None:
-        """Recursive search for large files in the directory"""
-        success, items = navigation.list_directory(current_path)
-        if not success:
-            return
-
-        for item in items:
-            item_path = os.path.join(current_path, item['name'])
-
-
-            if item['type'] == 'file':
-                try:
-                    file_size = os.path.getsize(item_path)
-                    # Adding information about the file to the list
-                    file_list.append({
-                        'path': item_path,
-                        'name': item['name'],
-                        'size': file_size
-                    })
-
-                    # Sort by size (descending)
-                    file_list.sort(key=get_file_size, reverse=True)
-                    # Leaving only the max_files of the largest ones
-                    if len(file_list) > max_files:
-                        file_list.pop()  # Delete the smallest one
-                except (OSError, PermissionError):
-                    continue
-            else:
-                # Recursively searching in subdirectories
-                find_large_files(item_path, file_list, max_files)
-
-    # Starting the search for large files
-    find_large_files(path, largest_files, 3)
+    lines.append("\n4. КРУПНЕЙШИЕ ФАЙЛЫ (ТОП-3):")
+    lines.append("-" * 40)
 
     if largest_files:
-        # Output the found files with formatting
-        for i, file_info in enumerate(largest_files, 1):
+        # Output the found files with formatting (largest first)
+        largest_files.sort(reverse=True)
+        for i, (_, _, file_info) in enumerate(largest_files, 1):
             filename = file_info['name']
             # Truncating long file names
             if len(filename) > 30:
                 filename = filename[:27] + "..."
             size_str = utils.format_size(file_info['size'])
-            print(f"  {i}. {filename:<35} {size_str}")
+            lines.append(f"  {i}. {filename:<35} {size_str}")
     else:
-        print(" Не найдено")
+        lines.append(" Не найдено")
+
+    lines.append("\n" + "=" * 60)
 
-    print("\n" + "=" * 60)
+    sys.stdout.write("\n".join(lines) + "\n")
     return True
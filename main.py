@@ -7,14 +7,57 @@ import analysis  # Модуль аналитика
 import search  # Модуль эксперта поиска
 
 
+# Messages for the common Windows error codes (OSError.winerror):
+# code -> (headline, hint). Access denied (code 5) is a PermissionError
+# and has its own handler in main()
+WINERROR_MESSAGES = {
+    3: ("Системе не удается найти указанный путь (код 3)",
+        "Проверьте, что папка существует и диск подключен."),
+    123: ("Недопустимое имя файла или папки (код 123)",
+          "Имя не должно содержать символы < > : \" / \\ | ? *"),
+}
+
+# Separator lines, built once instead of on every redraw
+HR80 = "-" * 80
+HR50 = "-" * 50
+
+# Static parts of the screens, built once at import time.
+# Only the placeholders in braces are filled in on every redraw
+BANNER_HEADER = "\n".join([
+    HR80,
+    " " * 20 + "ФАЙЛОВЫЙ МЕНЕДЖЕР",
+    HR80,
+]) + "\n"
+
+MAIN_MENU_TEMPLATE = "\n".join([
+    "",
+    "Текущий путь: {current_path}",
+    HR80,
+    "Доступные диски:",
+    "{drives}",
+    HR80,
+    "Доступные команды:",
+    " 1. Содержимое текущего каталога 📁",
+    " 2. Статистика текущей директории 📊",
+    " 3. Поиск файлов и директорий 🔍",
+    " 4. Анализ типов файлов 📈",
+    " 5. Переход в родительский каталог (..) ⬆",
+    " 6. Переход в подкаталог ⬇",
+    " 7. Сменить диск 💿",
+    " 8. Переход в системную папку Windows 🖥 ",
+    " 0. Завершение работы 🚪",
+    HR80,
+]) + "\n"
+
+
 def check_windows_environment() -> bool:
     """Checking that the program is running on Windows"""
     # Checking that the system is Windows
     if not utils.is_windows_os():
-        print("-" * 50)
+        print(HR50)
         print("ОШИБКА: Эта программа предназначена только для Windows!")
         print(f"Текущая операционная система: {sys.platform}")
-        print("-" * 50)
+        print(HR50)
         return False
             
     return True
@@ -22,52 +65,39 @@ def check_windows_environment() -> bool:
 
 def display_windows_banner() -> None:
     """Displaying a banner with information about Windows"""
-    print("-" * 80)
-    print(" " * 20 + "ФАЙЛОВЫЙ МЕНЕДЖЕР")
-    print("-" * 80)
+    # The banner is collected into a buffer and written in one call
+    lines = [BANNER_HEADER]
 
     # Current drive
     current_drive = navigation.get_current_drive()
-    print(f"Текущий диск💿: {current_drive}")
+    lines.append(f"Текущий диск💿: {current_drive}\n")
 
     # Available drives
     drives = navigation.list_available_drives()
-    print(f"Доступные диски💿: {', '.join(drives)}")
+    lines.append(f"Доступные диски💿: {', '.join(drives)}\n")
 
     # Current path
     current_path = os.getcwd()
-    print(f"Текущий путь: {current_path}")
+    lines.append(f"Текущий путь: {current_path}\n")
 
     # Special folders
-    print("\nСпециальные папки Windows📁:")
-    special_folders = navigation.get_windows_special_folders()
-    for name, path in special_folders.items():
-        if os.path.exists(path):
-            print(f"  {name}: {path}")
+    lines.append("\nСпециальные папки Windows📁:\n")
+    for name, path in navigation.get_windows_special_folders().items():
+        lines.append(f"  {name}: {path}\n")
+
+    lines.append(HR80 + "\n\n")
 
-    print("-" * 80)
-    print()
+    sys.stdout.write("".join(lines))
+    sys.stdout.flush()
 
 
 def display_main_menu(current_path: str) -> None:
     """Displaying the main menu for Windows"""
-    print(f"\nТекущий путь: {current_path}")
-    print("-" * 80)
-    print("Доступные диски:")
-    print(navigation.list_available_drives())
-    print("-" * 80)
-    
-    print("Доступные команды:")
-    print(" 1. Содержимое текущего каталога 📁")
-    print(" 2. Статистика текущей директории 📊")
-    print(" 3. Поиск файлов и директорий 🔍")
-    print(" 4. Анализ типов файлов 📈")
-    print(" 5. Переход в родительский каталог (..) ⬆")
-    print(" 6. Переход в подкаталог ⬇")
-    print(" 7. Сменить диск 💿")
-    print(" 8. Переход в системную папку Windows 🖥 ")
-    print(" 0. Завершение работы 🚪")
-    print("-" * 80)
+    sys.stdout.write(MAIN_MENU_TEMPLATE.format(
+        current_path=current_path,
+        drives=navigation.list_available_drives()
+    ))
+    sys.stdout.flush()
 
 
 def handle_windows_navigation(command: str, current_path: str) -> str:
@@ -92,69 +122,68 @@ def handle_windows_navigation(command: str, current_path: str) -> str:
     # Change the disk
     elif command == "7":
         i = 1
-        drives = navigation.list_available_drives()
+        # The user is choosing a drive right now: the list must be fresh
+        drives = navigation.list_available_drives(refresh=True)
         print("Доступные диски: ")
         
         for drive in drives:
             print(f" {i}. {drive}")
             i += 1
 
-        try:
-            choice = int(input("Выберите номер диска: "))
+        # The input is checked before the conversion, so a typo does
+        # not go through raising and catching a ValueError
+        raw_choice = input("Выберите номер диска: ").strip()
+
+        if not raw_choice.isdecimal():
+            print("Некорректный ввод")
+
+        elif 1 <= (choice := int(raw_choice)) <= len(drives):
+            new_drive = drives[choice - 1]
+            new_path = new_drive + "\\"
+            valid, error = utils.validate_windows_path(new_path)
             
-            if 1 <= choice <= len(drives):
-                new_drive = drives[choice - 1]
-                new_path = new_drive + "\\"
-                valid, error = utils.validate_windows_path(new_path)
-                
-                if valid:
-                    # function for changing the working directory
-                    os.chdir(new_path)
-                    print(f"Переход на диск: {new_drive}")
-                    return os.getcwd()
-                else:
-                    print(f"Ошибка перехода: {error}")
-                    
+            if valid:
+                # function for changing the working directory
+                os.chdir(new_path)
+                print(f"Переход на диск: {new_drive}")
+                # The new working directory is known, no need to ask for it
+                return os.path.abspath(new_path)
             else:
-                print("Некорректный выбор диска")
+                print(f"Ошибка перехода: {error}")
                 
-        except ValueError:
-            print("Некорректный ввод")
+        else:
+            print("Некорректный выбор диска")
 
     # Transfer to a special Windows folder
     elif command == "8":
         print("Специальные папки Windows:")
 
-        # Getting the dict
-        special_folders = navigation.get_windows_special_folders()
-        # Getting a list of tuples
-        folders_list = list(special_folders.items())
+        # Only the existing folders are returned (navigation caches them),
+        # so the numbers match the positions in the list
+        folders_list = list(navigation.get_windows_special_folders().items())
 
-        i = 1
-        for (name, path) in folders_list:
-            if os.path.exists(path):
-                print(f"  {i}. {name} ({path})")
-                i += 1
+        for i, (name, path) in enumerate(folders_list, 1):
+            print(f"  {i}. {name} ({path})")
                 
-        try:
-            choice = int(input("Выберите номер папки: "))
+        raw_choice = input("Выберите номер папки: ").strip()
+
+        if not raw_choice.isdecimal():
+            print("Введите номер папки")
+
+        elif 1 <= (choice := int(raw_choice)) <= len(folders_list):
+            name, path = folders_list[choice - 1]
             
-            if 1 <= choice <= len(folders_list):
-                name, path = folders_list[choice - 1]
+            try:
+                os.chdir(path)
+                print(f"Переход в: {name}")
+                return os.path.abspath(path)
                 
-                if os.path.exists(path):
-                    os.chdir(path)
-                    print(f"Переход в: {name}")
-                    return os.getcwd()
-                    
-                else:
-                    print(f"Папка '{name}' не найдена")
-                    
-            else:
-                print("Неверный номер")
+            except OSError:
+                # The folder may have been removed since it was cached
+                print(f"Папка '{name}' не найдена")
                 
-        except ValueError:
-            print("Введите номер папки")
+        else:
+            print("Неверный номер")
 
     return current_path
 
@@ -173,13 +202,15 @@ def handle_windows_analysis(command: str, current_path: str) -> None:
         
         if success:
             print("\nСтатистика по расширениям файлов:")
-            print("-" * 50)
+            print(HR50)
             
+            # The statistics are already sorted by the number of files
+            # and carry the formatted size, so they are printed as is
             for ext, data in stats.items():
                 # Skip files without extension
                 if ext:
-                    print(f"{ext} : {data['count']} файлов, {utils.format_size(data['size'])}")
-            print("-" * 50)
+                    print(f"{ext} : {data['count']} файлов, {data['formatted_size']}")
+            print(HR50)
             
         else:
             print("Ошибка при анализе типов файлов")
@@ -191,36 +222,61 @@ def handle_windows_search(command: str, current_path: str) -> None:
         search.search_menu_handler(current_path)
 
 
-def run_windows_command(command: str, current_path: str) -> str:
-    """Main command handler using match case"""
-    new_path = current_path
-
-    match command:
-        case "1":
-            print(f"\nСодержимое директории: {current_path}")
-            success, items = navigation.list_directory(current_path)
-            if success:
-                navigation.format_directory_output(items)
-            else:
-                print("Ошибка при получении содержимого директории")
+def show_directory_contents(command: str, current_path: str) -> str:
+    """Command 1: output of the contents of the current directory"""
+    print(f"\nСодержимое директории: {current_path}")
+    success, items = navigation.list_directory(current_path)
+    if success:
+        # The table is written to the console at once
+        navigation.format_directory_output(items)
+    else:
+        print("Ошибка при получении содержимого директории")
 
-        case "2" | "4":  
-            handle_windows_analysis(command, current_path)
+    return current_path
 
-        case "3":  
-            handle_windows_search(command, current_path)
 
-        case "5" | "6" | "7" | "8":  
-            new_path = handle_windows_navigation(command, current_path)
+def run_analysis_command(command: str, current_path: str) -> str:
+    """Commands 2 and 4: the analysis does not change the current path"""
+    handle_windows_analysis(command, current_path)
+    return current_path
 
-        case "0":  
-            print("Выход из программы...")
-            sys.exit(0)
 
-        case _:
-            print("Неизвестная команда. Пожалуйста, выберите команду из меню.")
+def run_search_command(command: str, current_path: str) -> str:
+    """Command 3: the search does not change the current path"""
+    handle_windows_search(command, current_path)
+    return current_path
+
 
-    return new_path
+def exit_program(command: str, current_path: str) -> NoReturn:
+    """Command 0: exit from the program"""
+    print("Выход из программы...")
+    sys.exit(0)
+
+
+def unknown_command(command: str, current_path: str) -> str:
+    """Any command that is not in the menu"""
+    print("Неизвестная команда. Пожалуйста, выберите команду из меню.")
+    return current_path
+
+
+# Command -> handler(command, current_path) returning the new current path
+COMMAND_HANDLERS = {
+    "1": show_directory_contents,
+    "2": run_analysis_command,
+    "3": run_search_command,
+    "4": run_analysis_command,
+    "5": handle_windows_navigation,
+    "6": handle_windows_navigation,
+    "7": handle_windows_navigation,
+    "8": handle_windows_navigation,
+    "0": exit_program,
+}
+
+
+def run_windows_command(command: str, current_path: str) -> str:
+    """Main command handler using the COMMAND_HANDLERS table"""
+    handler = COMMAND_HANDLERS.get(command, unknown_command)
+    return handler(command, current_path)
 
 
 def main() -> NoReturn:
@@ -251,8 +307,19 @@ def main() -> NoReturn:
             print("Запустите программу от имени администратора или выберите другой путь.")
             break
 
-        except OSError:
-            print("\nОШИБКА работы операционной системы")
+        except OSError as e:
+            # winerror is only set on Windows
+            winerror = getattr(e, 'winerror', None)
+            message = WINERROR_MESSAGES.get(winerror)
+
+            if message:
+                headline, hint = message
+                print(f"\nОШИБКА: {headline}")
+                print(hint)
+            elif winerror is not None:
+                print(f"\nОШИБКА Windows (код {winerror}): {e}")
+            else:
+                print("\nОШИБКА работы операционной системы")
             break
             
     sys.exit(0)
@@ -1,12 +1,99 @@
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Tuple
+import stat
+import sys
+from typing import List, Dict, Any, Tuple, TextIO, NamedTuple, Union
 # Importing architect functions
 import utils
 #ctypes allows you to call functions from Windows DLL libraries directly in Python
 import ctypes
 # Library for getting string constants
 import string
+# Monotonic clock for the caches below
+import time
+
+
+# Drives and special folders almost never change during a session,
+# so the results are reused for this many seconds (the only cache of them,
+# main.py calls these functions directly)
+DRIVES_TTL = 5.0
+SPECIAL_FOLDERS_TTL = 60.0
+
+# Cached results and the time they were obtained
+_drives_cache = None
+_drives_time = 0.0
+_special_folders_cache = None
+_special_folders_time = 0.0
+
+# Paths that recently failed in move_down(): path -> (True, time of the failure)
+# (utils.ttl_cache_get/ttl_cache_put). A repeated attempt within MISSING_PATH_TTL
+# seconds is refused without touching the disk; the oldest entry is dropped above
+# MISSING_PATH_LIMIT
+MISSING_PATH_TTL = 1.0
+MISSING_PATH_LIMIT = 256
+_missing_paths = {}
+
+# The environment does not change while the program is running,
+# so the paths of the special folders are built once (see get_windows_special_folders)
+_user_profile = os.environ.get('USERPROFILE', '')
+_system_root = os.environ.get('SystemRoot', '')
+
+# User folders: (readable name, full path), only the existing ones are returned
+USER_SPECIAL_FOLDERS = tuple(
+    (name, os.path.join(_user_profile, sub_path)) for name, sub_path in (
+        ('Desktop', 'Desktop'),
+        ('Downloads', 'Downloads'),
+        ('Documents', 'Documents'),
+        ('Music', 'Music'),
+        ('Pictures', 'Pictures'),
+        ('Videos', 'Videos'),
+        ('AppData', 'AppData'),
+        ('Local/AppData', 'AppData\\Local'),
+        ('Roaming/AppData', 'AppData\\Roaming'),
+    )
+)
+
+# System folders: (readable name, full path), only the existing ones are returned
+SYSTEM_SPECIAL_FOLDERS = (
+    ('Windows', _system_root),
+    ('System32', os.path.join(_system_root, 'System32')),
+    ('SysWOW64', os.path.join(_system_root, 'SysWOW64')),
+    ('ProgramFiles', os.environ.get('ProgramFiles', '')),
+    ('ProgramFilesX86', os.environ.get('ProgramFiles(x86)', '')),
+)
+
+class DirectoryItem(NamedTuple):
+    '''
+    One element of a directory returned by list_directory()
+    
+    A tuple with named fields takes several times less memory than a dict
+    and its fields are read by position, without hashing the keys
+    '''
+    name: str                 # file or folder name
+    type: str                 # element type: 'file' or 'directory'
+    size: Union[str, int]     # formatted size (for files) or 0 (for folders)
+    modified: str             # last modified date in 'YYYY-MM-DD' format
+    hidden: bool              # is the element hidden
+
+
+# GetLogicalDrives is bound once instead of the windll.kernel32 lookup on every call
+if os.name == 'nt':
+    _GetLogicalDrives = ctypes.WinDLL('kernel32', use_last_error=True).GetLogicalDrives
+    _GetLogicalDrives.argtypes = ()
+    _GetLogicalDrives.restype = ctypes.c_uint32
+else:
+    _GetLogicalDrives = None
+
+# Drive names by bit number of the GetLogicalDrives mask: 0 -> 'A:', ... 25 -> 'Z:'
+_DRIVE_NAMES = tuple(f'{letter}:' for letter in string.ascii_uppercase)
+
+# Attribute bits tested for every element of a directory (module constants,
+# not a lookup in the stat module per element)
+_HIDDEN_MASK = stat.FILE_ATTRIBUTE_HIDDEN
+_DIRECTORY_MASK = stat.FILE_ATTRIBUTE_DIRECTORY
+
+# Fixed lines of the directory table (see format_directory_output)
+TABLE_SEPARATOR = '-' * 100
+TABLE_HEADER = f'{'ТИП':<8} {'ИМЯ':<45} {'РАЗМЕР':<15} {'ИЗМЕНЕНИЕ':<22} {'СКРЫТЫЙ':<10}'
 
 
 def get_current_drive() -> str:
@@ -30,44 +117,54 @@ def get_current_drive() -> str:
     return drive
 
 
-def list_available_drives() -> List[str]:
+def list_available_drives(refresh: bool = False) -> List[str]:
     '''
     The function returns a list of all available disks in the Windows operating system
     
+    Args:
+        refresh (bool): ask the system even if the cached list is still fresh
+    
     Returns:
         List[str]:
             A list of available drive letters with a colon (['C:', 'D:', 'E:'])
+    
+    The result is cached for DRIVES_TTL seconds, a copy of it is returned
     '''
+    global _drives_cache, _drives_time
+
+    now = time.monotonic()
+    if not refresh and _drives_cache is not None and now - _drives_time < DRIVES_TTL:
+        return list(_drives_cache)
+
     drives = []
     
-    try:          
-        # We get a bitmask of disks (a 32-bit number, where each bit represents a disk)
-        # If bit = 1, then the corresponding disk exists
-        drives_bitmask = ctypes.windll.kernel32.GetLogicalDrives()
+    # kernel32 only exists on Windows
+    if _GetLogicalDrives is None:
+        return []
+
+    # We get a bitmask of disks (a 32-bit number, where each bit represents a disk)
+    # If bit = 1, then the corresponding disk exists
+    drives_bitmask = _GetLogicalDrives()
+    
+    # We only go through the bits that are set, not through all 26 letters
+    # Each letter is assigned a number: 0 for A, 1 for B, ... 25 for Z
+    while drives_bitmask:
+        # bitmask & -bitmask keeps only the lowest set bit
+        # For example: 00001100 & -00001100 = 00000100
+        lowest_bit = drives_bitmask & -drives_bitmask
         
-        i = 0
-        # We go through all the letters from A to Z
-        # Each letter is assigned a number: 0 for A, 1 for B, ... 25 for Z
-        for letter in string.ascii_uppercase:
-            # << is the bitwise shift operator of the left operator to the left 
-            # for the number of positions specified by the right operator
-            # For example, for i=2: 1 (00000001) << 2 = 4 (00000100 in binary)
-            mask = 1 << i
-            
-            # Check the bit corresponding to the letter
-            if drives_bitmask & mask:
-                drive_name = f'{letter}:'
-                drives.append(drive_name)
-            
-            i += 1
+        # The number of the bit is its length minus one (00000100 -> 2 -> 'C:')
+        drives.append(_DRIVE_NAMES[lowest_bit.bit_length() - 1])
         
-        return drives
+        # ^ (XOR) clears this bit, the loop moves on to the next one
+        drives_bitmask ^= lowest_bit
     
-    except:
-        return []
+    _drives_cache = drives
+    _drives_time = now
+    return list(drives)
 
 
-def list_directory(path: str) -> Tuple[bool, List[Dict[str, Any]]]:
+def list_directory(path: str) -> Tuple[bool, List[DirectoryItem]]:
     '''
     The function displays the contents of a catalog in Windows with detailed information about each item.
     
@@ -75,104 +172,149 @@ def list_directory(path: str) -> Tuple[bool, List[Dict[str, Any]]]:
         path (str): the path to the directory whose contents you want to display
     
     Returns:
-        Tuple[bool, List[Dict[str, Any]]]:
+        Tuple[bool, List[DirectoryItem]]:
             - (True, list_elements): if the operation is successful
             - (False, []): if an error occurs
     
-    The structure of the item in the returned list:
-        {
-            'name': str, # file or folder name
-            'type': str, # element type: 'file' or 'directory'
-            'size': str, # formatted size (for files) or 0 (for folders)
-            'modified': str, # last modified date in 'YYYY-MM-DD' format
-            'hidden': bool # is the element hidden
-        }
+    The fields of each item are described in DirectoryItem
+    (name, type, size, modified, hidden)
     '''
 
-    data_dir = []
-    
-    # Checking the path
-    valid, _ = utils.validate_windows_path(path)
+    # Checking the path (a missing directory is reported by the reading below)
+    valid, _ = utils.validate_windows_path(path, known_exists=True)
     if not valid:
         return False, []
     
-    # Check the existence of a path
-    if not os.path.exists(path):
+    # A missing directory is reported by the reading itself
+    try:
+        raw_items = _read_directory(path)
+    except OSError:
         return False, []
+
+    # We are returning the collected items, not the raw names.
+    return True, _build_items(raw_items)
+
+
+def _build_items(raw_items: List[Tuple[str, bool, int, Any, int]]) -> List[DirectoryItem]:
+    '''
+    The function turns the raw data of _read_directory() into DirectoryItem elements
     
-    try:
-        # Getting a list of files and folders (names, without full path)
-        items = utils.safe_windows_listdir(path)
-        
-        for item in items:
-            # Getting the full path to the element
-            full_path = os.path.join(path, item)
-            
+    Args:
+        raw_items (List[Tuple]): (name, is_dir, size_bytes, mod_time, attrs) tuples
+    
+    Returns:
+        List[DirectoryItem]: the formatted elements in the same order
+    '''
+    # The number of elements is known, so the list is allocated once
+    data_dir = [None] * len(raw_items)
+    # A local name instead of the module attribute lookup on every file
+    format_size = utils.format_size
+
+    for index, (item_name, item_is_dir, size_bytes, mod_time, item_attrs) in enumerate(raw_items):
+        #Element type
+        if item_is_dir:
+            item_type = 'directory'
+        else:
+            item_type = 'file'
+
+        # Element size
+        if item_type == 'file':
+            # Format the size to a convenient look
+            # (small files are the most common case and need no call)
+            if size_bytes < 1024:
+                item_size = f'{size_bytes} B'
+            else:
+                item_size = format_size(size_bytes)
+        else:
+            item_size = 0
+    
+        # The time of the last change (None if the element could not be read)
+        item_modified = 'N/A'
+        if mod_time is not None:
             try:
-                #Element name
-                item_name = item
+                # We bring the time (seconds since 1970) to the desired form
+                # (the fields of struct_time are cheaper than a datetime + strftime)
+                local_time = time.localtime(mod_time)
+                item_modified = f'{local_time.tm_year:04d}-{local_time.tm_mon:02d}-{local_time.tm_mday:02d}'
+            except (ValueError, OverflowError, OSError):
+                # The time is out of the supported range
+                pass
 
-                #Element type
-                if os.path.isdir(full_path):
-                    item_type = 'directory'
-                else:
-                    item_type = 'file'
+        # Checking for a hidden file (the attributes are already known)
+        item_hidden = bool(item_attrs & _HIDDEN_MASK)
 
-                # Element size
-                try:
-                    if item_type == 'file':
-                        # We get the size of the element in bytes
-                        size = os.path.getsize(full_path)
-                        # Format the size to a convenient look
-                        item_size = utils.format_size(size)
-                    else:
-                        item_size = 0
-                except:
-                    item_size = 0
-                
-                # The time of the last change
+        data_dir[index] = DirectoryItem(item_name, item_type, item_size, item_modified, item_hidden)
+
+    return data_dir
+
+
+def _read_directory(path: str) -> List[Tuple[str, bool, int, Any, int]]:
+    '''
+    The function reads the raw data of all the elements of a directory
+    
+    Args:
+        path (str): the path to the directory
+    
+    Returns:
+        List[Tuple[str, bool, int, Any, int]]:
+            (name, is directory, size in bytes, time of the last change or None, attributes)
+    
+    Raises:
+        OSError: if the directory cannot be read
+    
+    On Windows the whole directory is read in large batches (utils.fast_windows_listdir),
+    otherwise (or if it fails) with os.scandir(). Neither makes a call per element.
+    '''
+    if os.name == 'nt':
+        try:
+            return [
+                (name, bool(attrs & _DIRECTORY_MASK), size, mod_time, attrs)
+                for name, attrs, size, mod_time in utils.fast_windows_listdir(path)
+            ]
+        except OSError:
+            # Falling back to os.scandir() below
+            pass
+
+    raw_items = []
+
+    # os.scandir() returns the entries together with the data that Windows
+    # gives for free while listing (type, size, attributes, times)
+    with os.scandir(path) as entries:
+        for entry in entries:
+            # The single stat of the element gives the type, the size,
+            # the attributes and the time (on Windows it is served from the scandir data)
+            try:
+                item_stat = entry.stat(follow_symlinks=False)
+                # A link is shown with the type of its target
+                item_is_dir = (stat.S_ISDIR(item_stat.st_mode)
+                               or (stat.S_ISLNK(item_stat.st_mode) and entry.is_dir()))
+                # st_file_attributes is only available on Windows
+                raw_items.append((entry.name, item_is_dir, item_stat.st_size,
+                                  item_stat.st_mtime, getattr(item_stat, 'st_file_attributes', 0)))
+            except OSError:
+                # The element could not be read: only its name and type are known
                 try:
-                    # We get the time of the last change as a float, the number of seconds since 1970
-                    mod_time = os.path.getmtime(full_path)
-                    # We bring the time to the desired form
-                    item_modified = datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d')
-                except:
-                    item_modified = 'N/A'
-
-                # Checking for a hidden file
-                item_hidden = utils.is_hidden_windows_file(full_path)
-                
-
-                data_dir.append({
-                    'name' : item_name,
-                    'type' : item_type,
-                    'size' : item_size,
-                    'modified' : item_modified,
-                    'hidden' : item_hidden
-                })
-                
-            except:
-                continue
-       
-        # We are returning the collected dictionaries, not the raw names.
-        return True, data_dir
-        
-    except:
-        return False, []
+                    item_is_dir = entry.is_dir()
+                except OSError:
+                    item_is_dir = False
+                raw_items.append((entry.name, item_is_dir, 0, None, 0))
 
+    return raw_items
 
-def format_directory_output(items: List[Dict[str, Any]]) -> None:
+
+def format_directory_output(items: List[DirectoryItem], out: TextIO = None) -> None:
     '''
     The function of formatted output of directory contents to the Windows console
     
     Args:
-        items (List[Dict[str, Any]]): A list of catalog items obtained from list_directory()
-            Each item must contain the keys:
-            - 'name': str - the name of the file/folder
-            - 'type': str - type ('file' or 'directory')
-            - 'size': str - size (formatted string or number)
-            - 'modified': str - date of change in the format 'YYYY-MM-DD'
-            - 'hidden': bool - flag of the hidden element
+        items (List[DirectoryItem]): A list of catalog items obtained from list_directory()
+            The fields used:
+            - name: str - the name of the file/folder
+            - type: str - type ('file' or 'directory')
+            - size: str - size (formatted string or number)
+            - modified: str - date of change in the format 'YYYY-MM-DD'
+            - hidden: bool - flag of the hidden element
+        out (TextIO): where to write the table, sys.stdout if None
     
     Conclusion:
         Formatted table in the console with columns:
@@ -181,44 +323,49 @@ def format_directory_output(items: List[Dict[str, Any]]) -> None:
         - SIZE (15 characters): formatted file size or 0 for folders
         - CHANGE (22 characters): the date of the last change
         - HIDDEN (10 characters): "Hidden" or "Not hidden"
+    
+    The whole table is collected into a list of lines and written with one call
     '''
 
+    # Looked up at call time, so a redirected sys.stdout is respected
+    if out is None:
+        out = sys.stdout
+
     if not items:
-        print('Каталог пуст')
+        out.write('Каталог пуст\n')
         return
     
-    print('-' * 100)
-    
     # Column headers
-    print(f'{'ТИП':<8} {'ИМЯ':<45} {'РАЗМЕР':<15} {'ИЗМЕНЕНИЕ':<22} {'СКРЫТЫЙ':<10}')
-    print('-' * 100)
+    lines = [TABLE_SEPARATOR, TABLE_HEADER, TABLE_SEPARATOR]
     
     # Output of elements
     for item in items:
         # Type
-        if item['type'] == 'file':
+        if item.type == 'file':
             item_type = 'FILE'
         else:
             item_type = 'DIR'
         
         # Name
-        item_name = item['name']
+        item_name = item.name
         if len(item_name) > 38:
             item_name = item_name[:35] + '...'
 
         # Size
-        item_size = item['size']
+        item_size = item.size
 
         # Modified
-        item_modified = item['modified']
+        item_modified = item.modified
         
         # Hidden
-        if item['hidden']:
+        if item.hidden:
             item_hidden = 'Скрыт'
         else:
             item_hidden = 'Не скрыт'
         
-        print(f'{item_type:<8} {item_name:<45} {item_size:<15} {item_modified:<22} {item_hidden:<10}')
+        lines.append(f'{item_type:<8} {item_name:<45} {item_size:<15} {item_modified:<22} {item_hidden:<10}')
+
+    out.write('\n'.join(lines) + '\n')
 
 
 def move_up(current_path: str) -> str:
@@ -273,7 +420,8 @@ def move_up(current_path: str) -> str:
     # Find the index of the current disk in the list
     try:
         drive_index = drives.index(current_drive)
-    except:
+    except ValueError:
+        # The current disk is not in the list
         drive_index = 0
 
     # Switching to the next disk (cyclic)
@@ -303,14 +451,22 @@ def move_down(current_path: str, target_dir: str) -> Tuple[bool, str]:
     # Forming a new path
     new_path = os.path.join(current_path, target_dir)
     
-    # Validation check
-    is_valid, _ = utils.validate_windows_path(new_path)
-    if not is_valid:
+    # The same path has just failed
+    now = time.monotonic()
+    if utils.ttl_cache_get(_missing_paths, new_path, MISSING_PATH_TTL, now):
         return False, current_path
-    
-    # Checking the existence of a directory
-    if not os.path.isdir(new_path):
+
+    # Validation check and checking the existence of a directory
+    # (os.path.isdir() also proves the existence, so it is not checked twice)
+    is_valid, _ = utils.validate_windows_path(new_path, known_exists=True)
+    if not is_valid or not os.path.isdir(new_path):
+        utils.ttl_cache_put(_missing_paths, new_path, True, now, MISSING_PATH_LIMIT)
         return False, current_path
+
+    # The directory is entered now: the failures inside it are forgotten,
+    # so a folder created there is not refused until the TTL expires
+    for failed_path in [path for path in _missing_paths if os.path.dirname(path) == new_path]:
+        del _missing_paths[failed_path]
     
     return True, new_path
 
@@ -343,41 +499,39 @@ def get_windows_special_folders() -> Dict[str, str]:
         - SysWOW64: System Libraries (32-bit on a 64-bit system)
         - ProgramFiles: Program files (64-bit)
         - ProgramFilesX86: Program files (32-bit)
+    
+    Only the folders that exist are returned. The result is cached for SPECIAL_FOLDERS_TTL
+    seconds, a copy of it is returned
     '''
+    global _special_folders_cache, _special_folders_time
+
+    now = time.monotonic()
+    if _special_folders_cache is not None and now - _special_folders_time < SPECIAL_FOLDERS_TTL:
+        return dict(_special_folders_cache)
+
     special_dir = {}
     
-    # User folders
-    # Getting the path to the current user's profile
-    user_profile = os.environ.get('USERPROFILE', '')
-            
-    user_special = {
-        'Desktop' : 'Desktop',
-        'Downloads' : 'Downloads',
-        'Documents' : 'Documents',
-        'Music' : 'Music',
-        'Pictures' : 'Pictures',
-        'Videos' : 'Videos',
-        'AppData' : 'AppData',
-        'Local/AppData' : 'AppData\\Local',
-        'Roaming/AppData' : 'AppData\\Roaming',
-    }
-
-    for name, path in user_special.items():
-        # Forming a new path
-        full_path = os.path.join(user_profile, path)
-        # Checking the existence of a path
-        if os.path.exists(full_path):
+    # User folders share two parents (USERPROFILE and AppData): each parent is listed
+    # once and the folder names are looked up in its listing, not checked one by one
+    listed = {}
+    for name, full_path in USER_SPECIAL_FOLDERS:
+        parent, folder = os.path.split(full_path)
+        present = listed.get(parent)
+        if present is None:
+            present = set()
+            if parent:
+                present = {os.path.normcase(child) for child in utils.safe_windows_listdir(parent)}
+            listed[parent] = present
+
+        if os.path.normcase(folder) in present:
             special_dir[name] = full_path
 
+    # System folders have different parents (C:\\, Windows), one check per folder
+    # is cheaper than listing them
+    for name, full_path in SYSTEM_SPECIAL_FOLDERS:
+        if full_path and os.path.exists(full_path):
+            special_dir[name] = full_path
 
-    # System folders
-    windows = os.environ.get('SystemRoot', '')
-
-    special_dir['Windows'] = windows
-    special_dir['System32'] = os.path.join(windows, 'System32')
-    special_dir['SysWOW64'] = os.path.join(windows, 'SysWOW64')
-
-    special_dir['ProgramFiles'] = os.environ.get('ProgramFiles', '')
-    special_dir['ProgramFilesX86'] = os.environ.get('ProgramFiles(x86)', '')    
-
-    return special_dir
+    _special_folders_cache = special_dir
+    _special_folders_time = now
+    return dict(special_dir)
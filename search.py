@@ -1,174 +1,310 @@
 import os
 import re
-from typing import List, Dict, Any
+import sys
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Callable, Optional, Tuple, FrozenSet, Hashable
 
 import utils
 import navigation
 import analysis
 
 
-def find_files_windows(pattern: str, path: str, case_sensitive: bool = False) -> List[str]:
+# The walk waits on the file system most of the time and os.scandir()
+# releases the GIL meanwhile, so directories are listed by several threads
+SEARCH_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# The system folders hardly change between two menu calls, so the found
+# system files are reused for this many seconds (see find_windows_system_files)
+SYSTEM_FILES_TTL = 60.0
+
+# Search roots -> (time of the search, found files)
+_system_files_cache: Dict[Tuple[str, ...], Tuple[float, List[str]]] = {}
+
+
+# Users repeat the same patterns from the menu, the compiled ones are reused
+@functools.lru_cache(maxsize=256)
+def _wildcard_to_regex(pattern: str, case_sensitive: bool) -> re.Pattern:
     """
-    The function searches for files in Windows directories using a wildcard pattern.
+    The function compiles a wildcard pattern into a regular expression.
 
     Arguments:
         pattern (str):
             File name pattern supporting '*' and '?' wildcards.
-        path (str):
-            Root directory where the search starts.
         case_sensitive (bool):
-            -True: search is case-sensitive
-            -False: search is case-insensitive (default)
+            -True: the expression is case-sensitive
+            -False: the expression ignores case
 
     Return:
-        List[str]:
-            A list of full paths to files matching the pattern.
+        re.Pattern:
+            A compiled expression to be used with fullmatch().
+
+    Every part between two '*' is wrapped in an atomic group, as
+    fnmatch.translate() does: the part is bound to its first occurrence
+    and never retried, so patterns like '*a*a*a*b' do not backtrack.
     """
-    pattern = pattern.strip()
-    path = path.strip().replace("/", "\\")
-    path = os.path.normpath(path)
+    parts = []
+    for part in pattern.split("*"):
+        reg_part = ""
+        for letter in part:
+            if letter == "?":
+                reg_part += "."
+            else:
+                reg_part += re.escape(letter)
+        parts.append(reg_part)
 
-    regex_special = [".", "^", "$", "+", "{", "}", "[", "]", "(", ")", "|", "\\"]
+    # Without a '*' the pattern is matched as is
+    reg_ex = parts[0]
+    if len(parts) > 1:
+        for middle in parts[1:-1]:
+            # Several '*' in a row give empty parts
+            if middle:
+                reg_ex += "(?>.*?" + middle + ")"
+        reg_ex += ".*" + parts[-1]
 
-    reg_ex = ""
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(reg_ex, flags)
 
-    for letter in pattern:
-        if letter == "*":
-            reg_ex += "(.)*"
-        elif letter == "?":
-            reg_ex += "(.)"
-        else:
-            cur = letter
-            if case_sensitive == False:
-                cur = cur.lower()
 
-            if cur in regex_special:
-                reg_ex += "\\" + cur
-            else:
-                reg_ex += cur
-                
-    stack = [path]
-    visited = set()
-    result_files: List[str] = []
+def _normalize_windows_path(path: str) -> str:
+    """
+    The function brings a path to the Windows form (backslashes, no '.' or '..').
 
-    total_files = 0
+    Arguments:
+        path (str):
+            Path to normalize.
 
-    while len(stack) > 0:
-        current = stack.pop()
-        current = current.replace("/", "\\")
-        current = os.path.normpath(current)
+    Return:
+        str:
+            The normalized path.
 
-        if current in visited:
-            continue
-        visited.add(current)
+    The roots usually come in this form already (the menu passes the current
+    path): the substring checks run in C and spare a new string from normpath.
+    """
+    if (path and "/" not in path and "\\." not in path and ".\\" not in path
+            and "\\\\" not in path[1:] and not path.startswith(".")
+            and not path.endswith((".", "\\"))):
+        return path
 
-        dirs, files = navigation.list_directory(current)
+    return os.path.normpath(path.replace("/", "\\"))
 
-        for file_info in files:
-            file_name = str(file_info["name"]).strip()
-            if len(file_name) == 0:
-                continue
 
-            total_files += 1
+@functools.lru_cache(maxsize=256)
+def _normalize_extensions(extensions: Tuple[str, ...]) -> FrozenSet[str]:
+    """
+    The function brings extensions to the lowercase form with a leading dot.
 
-            if case_sensitive:
-                name_to_check = file_name
-            else:
-                name_to_check = file_name.lower()
-
-            for r_item in re.finditer(reg_ex, name_to_check):
-                if r_item.group() == name_to_check:
-                    full_path = os.path.join(current, file_name)
-                    full_path = full_path.replace("/", "\\")
-                    full_path = os.path.normpath(full_path)
-                    result_files.append(full_path)
-
-        for dir_name in dirs:
-            dir_name = str(dir_name).strip()
-            if len(dir_name) == 0:
-                continue
+    Arguments:
+        extensions (Tuple[str, ...]):
+            File extensions (with or without leading dot).
 
-            dir_path = os.path.join(current, dir_name)
-            dir_path = dir_path.replace("/", "\\")
-            dir_path = os.path.normpath(dir_path)
-            stack.append(dir_path)
+    Return:
+        FrozenSet[str]:
+            The normalized extensions, empty ones are dropped.
+    """
+    result = set()
 
-    analysis.count_files(total_files)
-    return result_files
+    for ext in extensions:
+        ext = str(ext).strip().lower()
+        if len(ext) == 0:
+            continue
+        if ext[0] != ".":
+            ext = "." + ext
+        result.add(ext)
 
+    return frozenset(result)
 
 
-def find_by_windows_extension(extensions: List[str], path: str) -> List[str]:
+def _directory_key(path: str) -> Optional[Hashable]:
     """
-    The function searches for files in Windows directories by file extensions.
+    The function returns the identity of a directory for the visited set.
 
     Arguments:
-        extensions (List[str]):
-            List of file extensions (with or without leading dot).
         path (str):
-            Root directory where the search starts.
+            Directory path.
 
     Return:
-        List[str]:
-            A list of full paths to files with matching extensions.
+        Optional[Hashable]:
+            -(st_dev, st_ino): the volume and the file index of the directory
+            -path: if the file system reports no file index
+            -None: if the directory cannot be read
+
+    Unlike the path string, the file index also recognizes a directory
+    reached a second time through a junction point.
     """
-    path = path.strip().replace("/", "\\")
-    path = os.path.normpath(path)
+    try:
+        dir_stat = os.stat(path)
+    except OSError:
+        return None
 
-    for i in range(len(extensions)):
-        extensions[i] = str(extensions[i]).strip().lower()
-        if len(extensions[i]) == 0:
-            continue
-        if extensions[i][0] != ".":
-            extensions[i] = "." + extensions[i]
+    if dir_stat.st_ino == 0:
+        return path
+    return dir_stat.st_dev, dir_stat.st_ino
+
+
+def _scan_for_search(current: str,
+                     on_file: Callable[[os.DirEntry], Any]) -> Tuple[List[Tuple[str, Hashable]], List[Any]]:
+    """
+    The function lists one directory for _walk_parallel().
+
+    Arguments:
+        current (str):
+            Directory to list.
+        on_file (Callable[[os.DirEntry], Any]):
+            Called for every file; a result other than None is collected.
 
-    stack = [path]
+    Return:
+        Tuple[List[Tuple[str, Hashable]], List[Any]]:
+            (path, key) of the subdirectories and the collected results.
+    """
+    subdirs: List[Tuple[str, Hashable]] = []
+    found: List[Any] = []
+
+    # One os.scandir() pass gives the names, the types and the sizes of the elements
+    try:
+        with os.scandir(current) as entries:
+            for entry in entries:
+                # Subdirectories are walked later (links are not followed)
+                if entry.is_dir(follow_symlinks=False):
+                    # The key needs a stat call (DirEntry has no file index on
+                    # Windows), it is made here on the worker thread
+                    dir_key = _directory_key(entry.path)
+                    if dir_key is not None:
+                        subdirs.append((entry.path, dir_key))
+                    continue
+
+                item = on_file(entry)
+                if item is not None:
+                    found.append(item)
+    except OSError:
+        # The directory cannot be read (no access or deleted meanwhile)
+        pass
+
+    return subdirs, found
+
+
+def _walk_parallel(path: str, on_file: Callable[[os.DirEntry], Any]) -> List[Any]:
+    """
+    The function walks a directory tree, listing directories on a thread pool.
+
+    Arguments:
+        path (str):
+            Root directory where the walk starts.
+        on_file (Callable[[os.DirEntry], Any]):
+            Called for every file; a result other than None is collected.
+
+    Return:
+        List[Any]:
+            The results of on_file() for the whole tree.
+
+    Every task lists one directory and returns its own lists, which are
+    merged here, so the workers share no state and need no lock.
+    """
+    root_key = _directory_key(path)
+    if root_key is None:
+        return []
+
+    stack = [(path, root_key)]
     visited = set()
+    results: List[Any] = []
 
-    search_result: List[str] = []
-    all_files_for_analysis: List[str] = []
+    with ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS) as executor:
+        pending = set()
 
-    while len(stack) > 0:
-        current = stack.pop()
-        current = current.replace("/", "\\")
-        current = os.path.normpath(current)
+        # Bound methods are looked up once, not for every directory
+        pop_dir = stack.pop
+        add_visited = visited.add
+        submit = executor.submit
 
-        if current in visited:
-            continue
-        visited.add(current)
+        while stack or pending:
+            while stack:
+                # The root is normalized by the caller and entry.path
+                # joins a name to it, so the paths need no normalization here
+                current, dir_key = pop_dir()
 
-        dirs, files = navigation.list_directory(current)
+                if dir_key in visited:
+                    continue
+                add_visited(dir_key)
 
-        for file_info in files:
-            file_name = str(file_info["name"]).strip()
-            file_type = str(file_info["type"]).strip().lower()
+                pending.add(submit(_scan_for_search, current, on_file))
 
-            if len(file_name) == 0:
-                continue
+            # Subdirectories of a listed directory are submitted right away
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, found = future.result()
+                stack.extend(subdirs)
+                results.extend(found)
 
-            full_path = os.path.join(current, file_name)
-            full_path = full_path.replace("/", "\\")
-            full_path = os.path.normpath(full_path)
+    return results
 
-            all_files_for_analysis.append(full_path)
 
-            for ext in extensions:
-                if file_type == ext:
-                    search_result.append(full_path)
+def find_files_windows(pattern: str, path: str, case_sensitive: bool = False) -> List[str]:
+    """
+    The function searches for files in Windows directories using a wildcard pattern.
 
-        for dir_name in dirs:
-            dir_name = str(dir_name).strip()
-            if len(dir_name) == 0:
-                continue
+    Arguments:
+        pattern (str):
+            File name pattern supporting '*' and '?' wildcards.
+        path (str):
+            Root directory where the search starts.
+        case_sensitive (bool):
+            -True: search is case-sensitive
+            -False: search is case-insensitive (default)
+
+    Return:
+        List[str]:
+            A sorted list of full paths to files matching the pattern.
+    """
+    pattern = pattern.strip()
+    path = _normalize_windows_path(path.strip())
+
+    # The pattern is compiled once for the whole search, and its bound
+    # method is taken once instead of an attribute lookup per file
+    fullmatch = _wildcard_to_regex(pattern, case_sensitive).fullmatch
+
+    def match_file(entry: os.DirEntry) -> Optional[str]:
+        if fullmatch(entry.name):
+            return entry.path
+        return None
+
+    # The directories are walked in parallel and finish in any order,
+    # so the result is sorted to be the same from run to run
+    found = _walk_parallel(path, match_file)
+    found.sort()
+    return found
+
+
+def find_by_windows_extension(extensions: List[str], path: str) -> List[str]:
+    """
+    The function searches for files in Windows directories by file extensions.
+
+    Arguments:
+        extensions (List[str]):
+            List of file extensions (with or without leading dot).
+        path (str):
+            Root directory where the search starts.
 
-            dir_path = os.path.join(current, dir_name)
-            dir_path = dir_path.replace("/", "\\")
-            dir_path = os.path.normpath(dir_path)
-            stack.append(dir_path)
+    Return:
+        List[str]:
+            A sorted list of full paths to files with matching extensions.
+    """
+    path = _normalize_windows_path(path.strip())
+
+    # The same lists come from the menu and find_windows_system_files()
+    norm_exts = _normalize_extensions(tuple(extensions))
+    # str.endswith() tests all the suffixes of a tuple in one C call
+    ext_suffixes = tuple(norm_exts)
 
-    analysis.analyze_windows_file_types(all_files_for_analysis)
+    def check_file(entry: os.DirEntry) -> Optional[str]:
+        if entry.name.lower().endswith(ext_suffixes):
+            return entry.path
+        return None
 
-    return search_result
+    # The same order from run to run, whatever thread finished first
+    found = _walk_parallel(path, check_file)
+    found.sort()
+    return found
 
 
 def find_large_files_windows(min_size_mb: float, path: str) -> List[Dict[str, Any]]:
@@ -188,69 +324,39 @@ def find_large_files_windows(min_size_mb: float, path: str) -> List[Dict[str, An
                 - size_mb (float): file size in megabytes
                 - type (str): file extension
     """
-    path = path.strip().replace("/", "\\")
-    path = os.path.normpath(path)
+    path = _normalize_windows_path(path.strip())
 
     min_bytes = int(min_size_mb * 1024 * 1024)
 
-    stack = [path]
-    visited = set()
-
-    result: List[Dict[str, Any]] = []
-    total_bytes = 0
-
-    while len(stack) > 0:
-        current = stack.pop()
-        current = current.replace("/", "\\")
-        current = os.path.normpath(current)
-
-        if current in visited:
-            continue
-        visited.add(current)
-
-        dirs, files = navigation.list_directory(current)
-
-        for file_info in files:
-            file_name = str(file_info["name"]).strip()
-            file_type = str(file_info["type"]).strip()
+    def check_size(entry: os.DirEntry) -> Optional[Tuple[int, str, str]]:
+        # On Windows the size comes with the listing, without a stat per file
+        try:
+            size_bytes = entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            # The file may have been deleted after the listing
+            return None
 
-            if len(file_name) == 0:
-                continue
-
-            full_path = os.path.join(current, file_name)
-            full_path = full_path.replace("/", "\\")
-            full_path = os.path.normpath(full_path)
-
-            if os.path.exists(full_path) == False:
-                continue
-
-            size_bytes = os.path.getsize(full_path)
-            total_bytes += size_bytes
-
-            if size_bytes >= min_bytes:
-                size_mb = size_bytes / (1024 * 1024)
-
-                info = {
-                    "path": full_path,
-                    "size_mb": round(size_mb, 2),
-                    "type": file_type
-                }
-                result.append(info)
+        if size_bytes < min_bytes:
+            return None
 
-        for dir_name in dirs:
-            dir_name = str(dir_name).strip()
-            if len(dir_name) == 0:
-                continue
+        # A flat tuple per match; the dictionaries are built after sorting.
+        # entry.path joins the name to the normalized root, it is used as is
+        return size_bytes, entry.path, entry.name
 
-            dir_path = os.path.join(current, dir_name)
-            dir_path = dir_path.replace("/", "\\")
-            dir_path = os.path.normpath(dir_path)
+    found: List[Tuple[int, str, str]] = _walk_parallel(path, check_size)
 
-            stack.append(dir_path)
+    # Tuples are compared by the size first, no key function is needed
+    found.sort(reverse=True)
 
-    analysis.count_bytes(total_bytes)
+    result: List[Dict[str, Any]] = []
+    for size_bytes, file_path, file_name in found:
+        size_mb = size_bytes / (1024 * 1024)
 
-    result.sort(key=lambda x: x["size_mb"], reverse=True)
+        result.append({
+            "path": file_path,
+            "size_mb": round(size_mb, 2),
+            "type": os.path.splitext(file_name)[1]
+        })
 
     return result
 
@@ -266,9 +372,10 @@ def find_windows_system_files(path: str) -> List[str]:
     Return:
         List[str]:
             A list of full paths to Windows system files (.exe, .dll, .sys).
+
+    The result for the same roots is cached for SYSTEM_FILES_TTL seconds
     """
-    path = path.strip().replace("/", "\\")
-    path = os.path.normpath(path)
+    path = _normalize_windows_path(path.strip())
 
     special = navigation.get_windows_special_folders()
 
@@ -288,18 +395,24 @@ def find_windows_system_files(path: str) -> List[str]:
     if len(roots) == 0:
         roots.append(path)
 
+    roots_key = tuple(roots)
+    now = time.monotonic()
+    cached = _system_files_cache.get(roots_key)
+    if cached is not None and now - cached[0] < SYSTEM_FILES_TTL:
+        return list(cached[1])
+
     system_files: list[str] = []
 
     for root in roots:
-        root = str(root).strip().replace("/", "\\")
-        root = os.path.normpath(root)
+        root = _normalize_windows_path(str(root).strip())
         if len(root) == 0:
             continue
 
         found = find_by_windows_extension([".exe", ".dll", ".sys"], root)
         system_files += found
 
-    return system_files
+    _system_files_cache[roots_key] = (now, system_files)
+    return list(system_files)
 
 
 
@@ -316,8 +429,7 @@ def search_menu_handler(current_path: str) -> bool:
             -True: return to the previous menu
             -False: exit menu handling
     """
-    current_path = current_path.strip().replace("/", "\\")
-    current_path = os.path.normpath(current_path)
+    current_path = _normalize_windows_path(current_path.strip())
 
     print("\n=== МЕНЮ ПОИСКА (Windows) ===")
     print("Текущий путь: " + current_path)
@@ -386,43 +498,38 @@ def format_windows_search_results(results: List, search_type: str) -> None:
     Return:
         None
     """ 
-    print("\n" + "=" * 60)
-    print("Тип поиска: " + str(search_type))
-    print("Найдено: " + str(len(results)))
-    print("=" * 60)
+    separator = "=" * 60
+    lines = ["\n" + separator,
+             "Тип поиска: " + str(search_type),
+             "Найдено: " + str(len(results)),
+             separator]
 
     if len(results) == 0:
-        print("Ничего не найдено.")
-        print("=" * 60 + "\n")
-        return
-
-    if isinstance(results[0], dict):
-        i = 1
-        for item in results:
-            p = item["path"]
-            size_mb = item["size_mb"]
-            ftype = item["type"]
-            print(str(i).rjust(4) + ". " + p + "   [" + str(ftype) + "]   (" + str(size_mb) + " MB)")
-            i += 1
-        print("=" * 60 + "\n")
-        return
-
-    i = 1
-    for fp in results:
-        fp = str(fp)
-        if os.path.exists(fp):
-            size_b = os.path.getsize(fp)
-            size_str = utils.format_size(size_b)
-            print(str(i).rjust(4) + ". " + fp + "   (" + size_str + ")")
-        else:
-            print(str(i).rjust(4) + ". " + fp)
-        i += 1
-
-    stats = analysis.get_windows_file_attributes_stats(results)
-    if isinstance(stats, dict) and len(stats) > 0:
-        print("\n[Атрибуты файлов] Статистика:")
+        lines.append("Ничего не найдено.")
+    elif isinstance(results[0], dict):
+        for i, item in enumerate(results, 1):
+            lines.append(f"{i:>4}. {item['path']}   [{item['type']}]   ({item['size_mb']} MB)")
+    else:
+        stats = analysis.create_attribute_stats()
+
+        for i, fp in enumerate(results, 1):
+            fp = str(fp)
+            # One stat gives both the size and the attributes of the file
+            try:
+                file_stat = os.stat(fp)
+            except OSError:
+                lines.append(f"{i:>4}. {fp}")
+                continue
+
+            lines.append(f"{i:>4}. {fp}   ({utils.format_size(file_stat.st_size)})")
+            # st_file_attributes is only available on Windows
+            analysis.add_file_attributes(stats, getattr(file_stat, "st_file_attributes", 0))
+
+        lines.append("\n[Атрибуты файлов] Статистика:")
         for k in stats:
-            print(" - " + str(k) + ": " + str(stats[k]))
+            lines.append(" - " + str(k) + ": " + str(stats[k]))
 
-    print("=" * 60 + "\n")
+    lines.append(separator + "\n")
 
+    # The whole report is written at once instead of a print() per line
+    sys.stdout.write("\n".join(lines) + "\n")
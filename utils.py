@@ -1,12 +1,95 @@
 import os
+import re
+import functools
+import logging
 import platform
+import time
+import struct
 from pathlib import Path
 from typing import Union, List, Tuple
 import ctypes
+from ctypes import wintypes
 
 
+# The paths are turned into str with os.fspath(), which returns a str argument as is
 PathString = Union[str, Path]
 
+# Listing errors are reported through logging: the message is only formatted
+# if a handler is going to show it (see safe_windows_listdir)
+_log = logging.getLogger(__name__)
+
+# The existence of a path checked by validate_windows_path() is reused for this many seconds:
+# path -> (exists, time of the check), the oldest entry is dropped above PATH_EXISTS_LIMIT
+PATH_EXISTS_TTL = 1.0
+PATH_EXISTS_LIMIT = 4096
+_path_exists_cache = {}
+
+# Characters that are not allowed anywhere in a Windows path. The colon is not
+# among them: it is allowed after the drive letter only (see WINDOWS_PATH_SYNTAX)
+FORBIDDEN_PATH_CHARS = '/*?"<>|'
+
+# The whole path syntax in one pass: an optional drive 'X:' and then no colon
+# and no forbidden character (the drive letter itself is checked by isalpha())
+WINDOWS_PATH_SYNTAX = re.compile(rf'(?:(.):)?[^:{re.escape(FORBIDDEN_PATH_CHARS)}]*')
+
+# The usual limit of a Windows path (MAX_PATH) and the limit of an extended-length
+# path written with the '\\?\' prefix, which the wide Win32 functions accept as is
+MAX_PATH_LENGTH = 260
+MAX_EXTENDED_PATH_LENGTH = 32767
+EXTENDED_PATH_PREFIX = '\\\\?\\'
+
+# The platform is checked once, and a disk root 'C:\\' is found by one set lookup
+# (both letter cases, as Windows accepts them), see get_parent_path
+_IS_WINDOWS = os.name == 'nt'
+_WIN_ROOTS = frozenset(f'{letter}:\\' for code in range(ord('A'), ord('Z') + 1)
+                       for letter in (chr(code), chr(code).lower()))
+
+
+# Constants for reading a directory by its handle (see fast_windows_listdir)
+FILE_LIST_DIRECTORY = 0x0001
+FILE_SHARE_ALL = 0x0001 | 0x0002 | 0x0004        # READ | WRITE | DELETE
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000          # Required to open a directory
+FILE_FULL_DIRECTORY_INFO = 14                    # FileFullDirectoryInfo class
+ERROR_NO_MORE_FILES = 18
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+FILE_ATTRIBUTE_HIDDEN = 0x2
+
+# One query fills this buffer with as many entries as fit into it
+DIRECTORY_BUFFER_SIZE = 64 * 1024
+
+# FILE_FULL_DIR_INFO without the name: NextEntryOffset, FileIndex, CreationTime,
+# LastAccessTime, LastWriteTime, ChangeTime, EndOfFile, AllocationSize,
+# FileAttributes, FileNameLength, EaSize; the UTF-16 name follows it
+FULL_DIR_INFO = struct.Struct('<IIqqqqqqIII')
+
+# The difference between FILETIME (100 ns since 1601) and the POSIX epoch (1970)
+FILETIME_EPOCH_OFFSET = 116444736000000000
+
+
+# The kernel32 functions are bound once, with their argument types
+if os.name == 'nt':
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+    _CreateFileW = _kernel32.CreateFileW
+    _CreateFileW.argtypes = (wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+                             wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p)
+    _CreateFileW.restype = ctypes.c_void_p
+
+    _GetFileInformationByHandleEx = _kernel32.GetFileInformationByHandleEx
+    _GetFileInformationByHandleEx.argtypes = (ctypes.c_void_p, ctypes.c_int,
+                                              ctypes.c_void_p, wintypes.DWORD)
+    _GetFileInformationByHandleEx.restype = wintypes.BOOL
+
+    _CloseHandle = _kernel32.CloseHandle
+    _CloseHandle.argtypes = (ctypes.c_void_p,)
+    _CloseHandle.restype = wintypes.BOOL
+
+    _GetFileAttributesW = _kernel32.GetFileAttributesW
+    _GetFileAttributesW.argtypes = (wintypes.LPCWSTR,)
+    _GetFileAttributesW.restype = wintypes.DWORD
+
 
 def is_windows_os() -> bool:
     '''
@@ -20,43 +103,132 @@ def is_windows_os() -> bool:
     return platform.system() == 'Windows'
 
 
-def validate_windows_path(path: PathString) -> Tuple[bool, str]:
+# The result depends only on the string, and navigation checks the same paths again and again
+@functools.lru_cache(maxsize=256)
+def _check_windows_path_syntax(path_str: str) -> Tuple[bool, str]:
+    '''
+    The function checks the characters and the length of the path (without touching the disk)
+    
+    Args:
+        path_str (str): the path to check
+    
+    Returns:
+        Tuple[bool, str]:
+            - (True, ''): if the path is written correctly
+            - (False, 'error message'): if it is not
+    '''
+    # An extended-length path is checked without its prefix ('?' is forbidden
+    # elsewhere) and is not limited to MAX_PATH
+    max_length = MAX_PATH_LENGTH
+    if path_str.startswith(EXTENDED_PATH_PREFIX):
+        path_str = path_str[len(EXTENDED_PATH_PREFIX):]
+        max_length = MAX_EXTENDED_PATH_LENGTH - len(EXTENDED_PATH_PREFIX)
+
+    # The colon (only after the drive letter) and the other forbidden characters,
+    # the string is scanned once
+    match = WINDOWS_PATH_SYNTAX.fullmatch(path_str)
+    if match is None:
+        return (False, 'Путь содержит запрещенный символ')
+
+    drive_letter = match.group(1)
+    if drive_letter is not None and not drive_letter.isalpha():
+        return (False, 'Путь содержит запрещенный символ')
+
+    # Checking the path length (len() does not scan the string)
+    if len(path_str) > max_length:
+        return (False, f'Длина пути превышает {max_length} символов')
+
+    return (True, '')
+
+
+def ttl_cache_get(cache: dict, key, ttl: float, now: float):
+    '''
+    The function returns a value of a small TTL cache (a dict of key -> (value, time))
+    
+    Args:
+        cache (dict): the cache filled by ttl_cache_put()
+        key: the key to look up
+        ttl (float): how many seconds a value stays valid
+        now (float): the current time (time.monotonic())
+    
+    Returns:
+        The value stored less than ttl seconds ago, or None (an expired entry is dropped)
+    '''
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    value, stored_time = entry
+    if now - stored_time < ttl:
+        return value
+
+    del cache[key]
+    return None
+
+
+def ttl_cache_put(cache: dict, key, value, now: float, limit: int) -> None:
+    '''
+    The function stores a value in a small TTL cache (see ttl_cache_get)
+    
+    Args:
+        cache (dict): the cache, key -> (value, time)
+        key: the key of the value
+        value: the value to store (not None)
+        now (float): the current time (time.monotonic())
+        limit (int): the largest number of entries, the oldest one is dropped above it
+    '''
+    cache[key] = (value, now)
+
+    # The dict keeps the insertion order, so the first key is the oldest one
+    if len(cache) > limit:
+        del cache[next(iter(cache))]
+
+
+def validate_windows_path(path: PathString, known_exists: bool = False) -> Tuple[bool, str]:
     '''
     The function checks the correctness of the path for the Windows operating system
     
     Args:
         path (PathString): the path to the file or directory to check
+        known_exists (bool): the caller checks the existence itself (a listing, a stat
+            or os.path.isdir right after), so os.path.exists is skipped
     
     Returns:
         Tuple[bool, str]:
             - (True, ''): if the path is valid
             - (False, 'error message'): if the path is invalid
+    
+    The checks of the characters and the length are cached (_check_windows_path_syntax),
+    the existence of the path can change, so it is reused only for PATH_EXISTS_TTL seconds
     '''
-    path_str = str(path)
+    path_str = os.fspath(path)
 
-    # Colon handling
-    if ':' in path_str:
-        if not (path_str.count(':') == 1 and path_str[1] == ':' and path_str[0].isalpha()):
-            return (False, 'Путь содержит запрещенный символ')
+    valid, error = _check_windows_path_syntax(path_str)
+    if not valid:
+        return (valid, error)
 
-
-    # Other forbidden characters
-    forbidden_chars = '/*?"<>|'
-    for char in forbidden_chars:
-        if char in path_str:
-            return (False, 'Путь содержит запрещенный символ')
-
-    # Checking the path length
-    if len(path_str) > 260:
-        return (False, f'Длина пути превышает 260 символов')
+    if known_exists:
+        return (True, '')
 
     # Checking for the existence of a path
-    if not os.path.exists(path_str):
+    now = time.monotonic()
+    exists = ttl_cache_get(_path_exists_cache, path_str, PATH_EXISTS_TTL, now)
+    if exists is None:
+        exists = os.path.exists(path_str)
+        ttl_cache_put(_path_exists_cache, path_str, exists, now, PATH_EXISTS_LIMIT)
+
+    if not exists:
         return (False, 'Путь не существует')
 
     return (True, '')
 
 
+# (divisor, unit) by the power of 1024, see format_size
+SIZE_UNITS = ((1, 'B'), (1024, 'KB'), (1024**2, 'MB'), (1024**3, 'GB'))
+
+
+# The function is pure and the same sizes repeat a lot (0, block sizes)
+@functools.lru_cache(maxsize=4096)
 def format_size(size_bytes: int) -> str:
     '''
     The function formats the file size from bytes into KB, MB, and GB lines
@@ -74,16 +246,15 @@ def format_size(size_bytes: int) -> str:
 
     if size_bytes < 1024:
         return f'{size_bytes} B'
-    
-    if size_bytes < 1024**2:
-        return f'{round(size_bytes / 1024, 1)} KB'
-    
-    if size_bytes < 1024**3:
-        return f'{round(size_bytes / 1024**2, 1)} MB'
-    
-    return f'{round(size_bytes / 1024**3, 1)} GB'
 
+    # The units are powers of 2**10, so the bit length gives the unit directly:
+    # 11-20 bits -> KB, 21-30 bits -> MB, more -> GB
+    divisor, unit = SIZE_UNITS[min(3, (size_bytes.bit_length() - 1) // 10)]
+    return f'{round(size_bytes / divisor, 1)} {unit}'
 
+
+# The function is pure and is called for the same paths on every step up the tree
+@functools.lru_cache(maxsize=1024)
 def get_parent_path(path: PathString) -> str:
     '''
     The function returns the path to the parent directory, taking into account the features of Windows
@@ -100,13 +271,19 @@ def get_parent_path(path: PathString) -> str:
         - For the path 'C:\\Users' parent directory: 'C:\\'
         - For the path 'C:\\' returns 'C:\\' (unchanged)
     '''
-    path_str = str(path)
+    path_str = os.fspath(path)
 
-    # Windows root path processing
-    if os.name == 'nt':
-        # Checking if it is the root of the disk
-        if len(path_str) == 3 and path_str.endswith(':\\'):
-            return path_str
+    # Windows root path processing: the root of the disk is its own parent
+    if _IS_WINDOWS and path_str in _WIN_ROOTS:
+        return path_str
+
+    # Usual case 'C:\\Users\\Name': everything before the last separator, found by one
+    # rpartition(). Roots, UNC paths, '/' and doubled separators go through os.path.dirname()
+    head, sep, _ = path_str.rpartition(os.sep)
+    if (sep and os.sep in head and not head.endswith((os.sep, ':'))
+            and not path_str.startswith(os.sep * 2)
+            and (os.altsep is None or os.altsep not in path_str)):
+        return head
 
     # Getting the parent directory
     parent = os.path.dirname(path_str)
@@ -139,32 +316,101 @@ def safe_windows_listdir(path: PathString) -> List[str]:
         - OSError: system errors, paths that are too long (>260 characters)
     
     '''
-    path_obj = Path(path)
-    contents_list = []
-
     try:
-        # Getting a list of element names
-        for child in path_obj.iterdir():
-            contents_list.append(child.name)
+        # Getting a list of element names (os.scandir() makes no Path object per element)
+        with os.scandir(os.fspath(path)) as entries:
+            contents_list = [entry.name for entry in entries]
 
     # Access error
     except PermissionError:
-        print(f'Отказано в доступе к: {path}')
+        _log.warning('Отказано в доступе к: %s', path)
         return []
 
     # The directory does not exist
     except FileNotFoundError:
-        print(f'Директория не найдена: {path}')
+        _log.warning('Директория не найдена: %s', path)
         return []
 
     # Other system errors, including paths that are too long
     except OSError as e:
-        print(f'Путь слишком длинный: {path}')
+        _log.warning('Путь слишком длинный: %s (%s)', path, e)
         return []
     
     return contents_list
 
 
+def _parse_full_dir_info(buffer, entries: List[Tuple[str, int, int, float]]) -> None:
+    '''
+    The function unpacks the chain of FILE_FULL_DIR_INFO records from one query
+    
+    Args:
+        buffer: the buffer filled by GetFileInformationByHandleEx (or bytes)
+        entries (List[Tuple[str, int, int, float]]): the list where the elements are added
+    '''
+    offset = 0
+    while True:
+        (next_offset, _, _, _, write_time, _, size, _,
+         attributes, name_length, _) = FULL_DIR_INFO.unpack_from(buffer, offset)
+
+        name_start = offset + FULL_DIR_INFO.size
+        # NTFS allows unpaired surrogates in names: they are kept as os.listdir() does
+        name = buffer[name_start:name_start + name_length].decode('utf-16-le', 'surrogatepass')
+        if name != '.' and name != '..':
+            mod_time = (write_time - FILETIME_EPOCH_OFFSET) / 10_000_000
+            entries.append((name, attributes, size, mod_time))
+
+        # The last record in the buffer has no next one
+        if not next_offset:
+            break
+        offset += next_offset
+
+
+def fast_windows_listdir(path: PathString) -> List[Tuple[str, int, int, float]]:
+    '''
+    The function reads the whole directory through its handle, in large batches
+    
+    Args:
+        path (PathString): the path to the directory whose contents you want to get
+    
+    Returns:
+        List[Tuple[str, int, int, float]]:
+            - (name, attributes, size in bytes, time of the last change) for every element
+            - attributes are the FILE_ATTRIBUTE_* bits, the time is in seconds since 1970
+    
+    Raises:
+        OSError: if the directory cannot be read (or the system is not Windows)
+    
+    Note:
+        GetFileInformationByHandleEx(FileFullDirectoryInfo) is a thin wrapper over
+        NtQueryDirectoryFile: each call fills a 64 KB buffer with hundreds of
+        FILE_FULL_DIR_INFO records, which are unpacked in place. Unlike FindNextFileW,
+        there is no copy into WIN32_FIND_DATAW per element and no call per element.
+    '''
+    if os.name != 'nt':
+        raise OSError('Reading a directory by its handle is only available on Windows')
+
+    handle = _CreateFileW(os.fspath(path), FILE_LIST_DIRECTORY, FILE_SHARE_ALL, None,
+                          OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None)
+    if handle is None or handle == INVALID_HANDLE_VALUE:
+        raise ctypes.WinError(ctypes.get_last_error())
+
+    entries = []
+    buffer = ctypes.create_string_buffer(DIRECTORY_BUFFER_SIZE)
+    try:
+        while _GetFileInformationByHandleEx(handle, FILE_FULL_DIRECTORY_INFO,
+                                            buffer, DIRECTORY_BUFFER_SIZE):
+            # The records are unpacked straight from the ctypes buffer, without a copy
+            _parse_full_dir_info(buffer, entries)
+
+        error = ctypes.get_last_error()
+        if error != ERROR_NO_MORE_FILES:
+            raise ctypes.WinError(error)
+    finally:
+        _CloseHandle(handle)
+
+    return entries
+
+
 def is_hidden_windows_file(path: PathString) -> bool:
     '''
     The function checks whether the file is hidden
@@ -194,13 +440,21 @@ def is_hidden_windows_file(path: PathString) -> bool:
         FILE_ATTRIBUTE_ARCHIVE     = 0x20
     '''
 
-    path_str = str(path)
+    # The attributes can only be read on Windows
+    if os.name != 'nt':
+        return False
+
+    path_str = os.fspath(path)
+
+    # Getting the file attributes (the function is bound once, see above)
+    file_atr = _GetFileAttributesW(path_str)
 
-    # Getting the file attributes
-    file_atr = ctypes.windll.kernel32.GetFileAttributesW(path_str)
+    # A missing or unreadable file gives INVALID_FILE_ATTRIBUTES (all bits set)
+    if file_atr == INVALID_FILE_ATTRIBUTES:
+        return False
 
     # Check the hidden bit (FILE_ATTRIBUTE_HIDDEN = 0x2)
-    if file_atr & 2:
+    if file_atr & FILE_ATTRIBUTE_HIDDEN:
         return True
     
     return False